@@ -3,38 +3,164 @@ Monitor Switcher - Automatically switch monitor input based on KM switch usage
 """
 import os
 import sys
+import importlib
 import json
-import time
+import ctypes
+from ctypes import wintypes
+import queue
 import threading
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional, Dict, Any
 
-import pystray
-from PIL import Image, ImageDraw
-from monitorcontrol import get_monitors, InputSource, VCPError
 import win32api
 import win32con
 import win32gui
+import win32gui_struct
 
-# Configure logging
+# Bundled data files (PyInstaller unpacks them under sys._MEIPASS)
+RESOURCE_DIR = Path(getattr(sys, '_MEIPASS', Path(__file__).parent)) / 'resources'
+
+# WM_DEVICECHANGE event types (dbt.h)
+DBT_DEVICEARRIVAL = 0x8000
+DBT_DEVICEREMOVECOMPLETE = 0x8004
+
+# Device interface class for HID devices (keyboards, mice)
+GUID_DEVINTERFACE_HID = "{4D1E55B2-F16F-11CF-88CB-001111000030}"
+
+# SetupDiGetClassDevs flags (setupapi.h)
+DIGCF_PRESENT = 0x02
+DIGCF_DEVICEINTERFACE = 0x10
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+
+
+class GUID(ctypes.Structure):
+    _fields_ = [
+        ("Data1", wintypes.DWORD),
+        ("Data2", wintypes.WORD),
+        ("Data3", wintypes.WORD),
+        ("Data4", ctypes.c_ubyte * 8),
+    ]
+
+
+class SP_DEVICE_INTERFACE_DATA(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", wintypes.DWORD),
+        ("InterfaceClassGuid", GUID),
+        ("Flags", wintypes.DWORD),
+        ("Reserved", ctypes.c_void_p),
+    ]
+
+
+HID_INTERFACE_GUID = GUID(
+    0x4D1E55B2, 0xF16F, 0x11CF,
+    (ctypes.c_ubyte * 8)(0x88, 0xCB, 0x00, 0x11, 0x11, 0x00, 0x00, 0x30)
+)
+
+# SetupAPI functions, bound once so the device-change path does no lookups
+setupapi = ctypes.WinDLL('setupapi', use_last_error=True)
+_SetupDiGetClassDevs = setupapi.SetupDiGetClassDevsW
+_SetupDiGetClassDevs.argtypes = [
+    ctypes.POINTER(GUID), wintypes.LPCWSTR, wintypes.HWND, wintypes.DWORD
+]
+_SetupDiGetClassDevs.restype = ctypes.c_void_p
+_SetupDiEnumDeviceInterfaces = setupapi.SetupDiEnumDeviceInterfaces
+_SetupDiEnumDeviceInterfaces.argtypes = [
+    ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(GUID),
+    wintypes.DWORD, ctypes.POINTER(SP_DEVICE_INTERFACE_DATA)
+]
+_SetupDiEnumDeviceInterfaces.restype = wintypes.BOOL
+_SetupDiDestroyDeviceInfoList = setupapi.SetupDiDestroyDeviceInfoList
+_SetupDiDestroyDeviceInfoList.argtypes = [ctypes.c_void_p]
+_SetupDiDestroyDeviceInfoList.restype = wintypes.BOOL
+
+_HID_INTERFACE_GUID_REF = ctypes.byref(HID_INTERFACE_GUID)
+_HID_PRESENT_FLAGS = DIGCF_PRESENT | DIGCF_DEVICEINTERFACE
+_SP_DEVICE_INTERFACE_DATA_SIZE = ctypes.sizeof(SP_DEVICE_INTERFACE_DATA)
+
+# Raw input device notifications (winuser.h)
+WM_INPUT_DEVICE_CHANGE = 0x00FE
+GIDC_ARRIVAL = 1
+GIDC_REMOVAL = 2
+RIDEV_REMOVE = 0x00000001
+RIDEV_DEVNOTIFY = 0x00002000
+HID_USAGE_PAGE_GENERIC = 0x01
+HID_USAGE_GENERIC_MOUSE = 0x02
+HID_USAGE_GENERIC_KEYBOARD = 0x06
+
+
+class RAWINPUTDEVICE(ctypes.Structure):
+    _fields_ = [
+        ("usUsagePage", wintypes.USHORT),
+        ("usUsage", wintypes.USHORT),
+        ("dwFlags", wintypes.DWORD),
+        ("hwndTarget", wintypes.HWND),
+    ]
+
+
+user32 = ctypes.WinDLL('user32', use_last_error=True)
+user32.RegisterRawInputDevices.argtypes = [
+    ctypes.POINTER(RAWINPUTDEVICE), wintypes.UINT, wintypes.UINT
+]
+user32.RegisterRawInputDevices.restype = wintypes.BOOL
+
+# Configure logging: callers only enqueue records, and a background
+# listener thread does the actual file/console writes
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('monitor_switcher.log', delay=True),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+log_listener = QueueListener(_log_queue, *_log_handlers)
+# Only the listener's handlers add the prefix, so the queued message is bare
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('monitor_switcher.log'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',
+    handlers=[QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
 
+# Mapping of input names to VCP 0x60 input source codes (MCCS values, the
+# same ones monitorcontrol's InputSource uses), and the reverse
+INPUT_SOURCES = MappingProxyType({
+    "HDMI-1": 0x11,
+    "HDMI-2": 0x12,
+    "DisplayPort-1": 0x0F,
+    "DisplayPort-2": 0x10,
+    "DVI-1": 0x03,
+    "DVI-2": 0x04,
+    "VGA-1": 0x01,  # VGA/RGB
+})
+INPUT_NAMES = MappingProxyType({source: name for name, source in INPUT_SOURCES.items()})
+
+# Config serializer: orjson's C encoder when available, else the stdlib.
+# Both keep the file indented since users edit it by hand.
+try:
+    import orjson
+
+    def _dump_json(data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dump_json(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, indent=2).encode()
+
+
 class Config:
     """Configuration manager for monitor switcher"""
 
     def __init__(self, config_file: str = "config.json"):
         self.config_file = Path(config_file)
         self.data = self._load_config()
+        # Saves can come from the tray menu, the config window and the KM
+        # detector at once, and all of them share one temp file
+        self._lock = threading.RLock()
 
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
@@ -50,18 +176,21 @@ class Config:
             "home_machine_input": "HDMI-1",  # HDMI-1, HDMI-2, DisplayPort-1, etc.
             "work_laptop_input": "HDMI-2",
             "monitor_index": 0,  # Index of monitor to control (0 = first)
-            "check_interval": 2.0,  # Seconds between checks
             "last_active_machine": "home"  # "home" or "work"
         }
 
     def save(self):
         """Save configuration to file"""
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.data, f, indent=4)
-            logger.info("Configuration saved")
-        except Exception as e:
-            logger.error(f"Error saving config: {e}")
+        with self._lock:
+            try:
+                # Write to a temp file and swap it in so a crash can't leave a torn file
+                tmp_path = self.config_file.with_name(self.config_file.name + '.tmp')
+                with open(tmp_path, 'wb') as f:
+                    f.write(_dump_json(self.data))
+                os.replace(tmp_path, self.config_file)
+                logger.info("Configuration saved")
+            except Exception as e:
+                logger.error(f"Error saving config: {e}")
 
     def get(self, key: str, default=None):
         """Get configuration value"""
@@ -69,159 +198,342 @@ class Config:
 
     def set(self, key: str, value):
         """Set configuration value"""
-        self.data[key] = value
-        self.save()
+        with self._lock:
+            self.data[key] = value
+            self.save()
+
+    def update(self, changes: Dict[str, Any]):
+        """Set several configuration values with a single save"""
+        with self._lock:
+            self.data.update(changes)
+            self.save()
 
 
 class MonitorController:
     """Controller for monitor input switching via DDC/CI"""
 
-    # Mapping of input names to VCP codes
-    INPUT_SOURCES = {
-        "HDMI-1": InputSource.HDMI1,
-        "HDMI-2": InputSource.HDMI2,
-        "DisplayPort-1": InputSource.DP1,
-        "DisplayPort-2": InputSource.DP2,
-        "DVI-1": InputSource.DVI1,
-        "DVI-2": InputSource.DVI2,
-        "VGA-1": 0x01,  # VGA/RGB
-    }
-
     def __init__(self, monitor_index: int = 0):
         self.monitor_index = monitor_index
         self.monitor = None
+        self._closed = False
+        # DDC/CI is not safe to use from several threads at once
+        self._lock = threading.Lock()
         self._init_monitor()
 
     def _init_monitor(self):
-        """Initialize monitor connection"""
+        """Initialize monitor connection and open its DDC/CI handle"""
+        from monitorcontrol import get_monitors
+
         try:
             monitors = get_monitors()
             if monitors and len(monitors) > self.monitor_index:
-                self.monitor = monitors[self.monitor_index]
+                monitor = monitors[self.monitor_index]
+                # Hold the handle open for the controller's lifetime instead
+                # of reopening it for every VCP request
+                monitor.__enter__()
+                self.monitor = monitor
                 logger.info(f"Connected to monitor at index {self.monitor_index}")
             else:
                 logger.warning(f"No monitor found at index {self.monitor_index}")
         except Exception as e:
             logger.error(f"Error initializing monitor: {e}")
 
+    def _close_monitor(self):
+        """Close the DDC/CI handle if one is open"""
+        if self.monitor:
+            try:
+                self.monitor.__exit__(None, None, None)
+            except Exception as e:
+                logger.error(f"Error closing monitor: {e}")
+            self.monitor = None
+
+    def close(self):
+        """Release the monitor connection; the controller can't be reused"""
+        with self._lock:
+            self._closed = True
+            self._close_monitor()
+
     def switch_input(self, input_name: str) -> bool:
         """Switch monitor to specified input"""
-        if not self.monitor:
-            logger.warning("No monitor connected, attempting to reconnect...")
-            self._init_monitor()
-            if not self.monitor:
-                return False
+        from monitorcontrol import VCPError
 
-        if input_name not in self.INPUT_SOURCES:
+        if input_name not in INPUT_SOURCES:
             logger.error(f"Unknown input source: {input_name}")
             return False
 
-        try:
-            input_source = self.INPUT_SOURCES[input_name]
-            with self.monitor:
+        with self._lock:
+            # A caller may still hold a controller that was just replaced;
+            # don't open a handle nothing would close
+            if self._closed:
+                logger.warning("Monitor controller is closed")
+                return False
+
+            if not self.monitor:
+                logger.warning("No monitor connected, attempting to reconnect...")
+                self._init_monitor()
+                if not self.monitor:
+                    return False
+
+            input_source = INPUT_SOURCES[input_name]
+
+            # Reading the input back is cheaper than a write, and skipping a
+            # redundant write avoids a visible blank on some monitors
+            try:
+                current = self.monitor.get_input_source()
+                if getattr(current, 'value', current) == input_source:
+                    logger.debug(f"Already on {input_name}")
+                    return True
+            except Exception as e:
+                # Not all monitors support reading the input; just write it
+                logger.debug(f"Could not read current input: {e}")
+
+            try:
                 self.monitor.set_input_source(input_source)
-            logger.info(f"Switched monitor to {input_name}")
-            return True
-        except VCPError as e:
-            logger.error(f"VCP Error switching input: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"Error switching input: {e}")
+                logger.info(f"Switched monitor to {input_name}")
+                return True
+            except VCPError as e:
+                logger.error(f"VCP Error switching input: {e}")
+            except Exception as e:
+                logger.error(f"Error switching input: {e}")
+
+            # The handle may have gone stale (e.g. monitor power cycled);
+            # drop it so the next switch reconnects
+            self._close_monitor()
             return False
 
     def get_current_input(self) -> Optional[str]:
         """Get current monitor input"""
-        if not self.monitor:
-            return None
+        with self._lock:
+            if not self.monitor:
+                return None
 
-        try:
-            with self.monitor:
+            try:
                 current = self.monitor.get_input_source()
-                # Find matching input name
-                for name, source in self.INPUT_SOURCES.items():
-                    if source == current:
-                        return name
-            return None
-        except Exception as e:
-            logger.error(f"Error getting current input: {e}")
-            return None
+                # InputSource is a plain Enum, so compare by its value
+                return INPUT_NAMES.get(getattr(current, 'value', current))
+            except Exception as e:
+                logger.error(f"Error getting current input: {e}")
+                return None
 
 
 class KMSwitchDetector:
-    """Detects when KM switch changes by monitoring USB device presence"""
+    """Detects when KM switch changes by listening for USB device notifications"""
+
+    # A state must hold this long before the callback fires; a KM switch
+    # emits a burst of events across its composite HID interfaces
+    DEBOUNCE_SECONDS = 0.15
+
+    # Pending state meaning "decide from the change in HID device count"
+    _RECOUNT = "recount"
 
     def __init__(self, callback):
         self.callback = callback
-        self.running = False
         self.thread = None
+        self.dispatch_thread = None
+        # Settled states, handed to a single worker so callbacks never overlap
+        self._settled = queue.Queue()
+        self.hwnd = None
         self.last_device_count = 0
         self.last_state = "home"  # Assume starting on home machine
+        self._pending_state = None
+        self._timer = None
+        self._state_lock = threading.Lock()
+        self._stop_event = threading.Event()
 
     def start(self):
-        """Start monitoring for device changes"""
-        self.running = True
-        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
+        """Start listening for device changes"""
+        self._stop_event.clear()
+        self.dispatch_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self.dispatch_thread.start()
+        self.thread = threading.Thread(target=self._message_loop, daemon=True)
         self.thread.start()
         logger.info("KM switch detector started")
 
     def stop(self):
-        """Stop monitoring"""
-        self.running = False
+        """Stop listening"""
+        # Set before reading self.hwnd: if the window isn't up yet, the
+        # listener thread sees the event and never starts pumping
+        self._stop_event.set()
+        with self._state_lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._pending_state = None
+        if self.hwnd:
+            win32gui.PostMessage(self.hwnd, win32con.WM_QUIT, 0, 0)
         if self.thread:
             self.thread.join(timeout=5)
+        # Wake the dispatcher and let any in-flight callback finish
+        self._settled.put(None)
+        if self.dispatch_thread:
+            self.dispatch_thread.join(timeout=5)
         logger.info("KM switch detector stopped")
 
-    def _monitor_loop(self):
-        """Main monitoring loop"""
+    def _dispatch_loop(self):
+        """Run the callback for each settled state, one at a time"""
+        while True:
+            new_state = self._settled.get()
+            if new_state is None:
+                break
+            try:
+                self.callback(new_state)
+            except Exception as e:
+                logger.error(f"Error handling KM switch: {e}")
+
+    def _message_loop(self):
+        """Create a hidden window and pump its messages until WM_QUIT"""
         # Get initial device count
         self.last_device_count = self._count_input_devices()
 
-        while self.running:
-            try:
-                current_count = self._count_input_devices()
-
-                # If device count changed significantly, KM switch likely occurred
-                if abs(current_count - self.last_device_count) >= 1:
-                    # Devices appeared = switched to this machine
-                    if current_count > self.last_device_count:
-                        new_state = "home"
-                    else:
-                        # Devices disappeared = switched away from this machine
-                        new_state = "work"
+        hinst = win32api.GetModuleHandle(None)
+        wc = win32gui.WNDCLASS()
+        wc.hInstance = hinst
+        wc.lpszClassName = "MonitorSwitcherDeviceListener"
+        wc.lpfnWndProc = {
+            win32con.WM_DEVICECHANGE: self._on_device_change,
+            WM_INPUT_DEVICE_CHANGE: self._on_input_device_change,
+        }
+        class_atom = None
+        notify_handle = None
+        raw_input_registered = False
 
-                    if new_state != self.last_state:
-                        logger.info(f"KM switch detected: {self.last_state} -> {new_state}")
-                        self.last_state = new_state
-                        self.callback(new_state)
+        try:
+            class_atom = win32gui.RegisterClass(wc)
+            # Message-only window: never shown, but still receives
+            # notifications registered with RegisterDeviceNotification
+            self.hwnd = win32gui.CreateWindowEx(
+                0, class_atom, "Monitor Switcher", 0, 0, 0, 0, 0,
+                win32con.HWND_MESSAGE, 0, hinst, None
+            )
 
-                    self.last_device_count = current_count
+            # Only notify for HID interfaces (keyboards and mice)
+            dev_filter = win32gui_struct.PackDEV_BROADCAST_DEVICEINTERFACE(
+                GUID_DEVINTERFACE_HID
+            )
+            notify_handle = win32gui.RegisterDeviceNotification(
+                self.hwnd, dev_filter, win32con.DEVICE_NOTIFY_WINDOW_HANDLE
+            )
 
-                time.sleep(2.0)  # Check every 2 seconds
+            # Also ask for WM_INPUT_DEVICE_CHANGE when keyboards/mice come and go
+            raw_input_registered = self._register_raw_input(RIDEV_DEVNOTIFY, self.hwnd)
 
-            except Exception as e:
-                logger.error(f"Error in monitor loop: {e}")
-                time.sleep(5.0)
+            # Blocks until stop() posts WM_QUIT
+            if not self._stop_event.is_set():
+                win32gui.PumpMessages()
+        except Exception as e:
+            logger.error(f"Error in device listener: {e}")
+        finally:
+            if notify_handle:
+                win32gui.UnregisterDeviceNotification(notify_handle)
+            if raw_input_registered:
+                self._register_raw_input(RIDEV_REMOVE, None)
+            if self.hwnd:
+                win32gui.DestroyWindow(self.hwnd)
+                self.hwnd = None
+            if class_atom:
+                win32gui.UnregisterClass(class_atom, hinst)
+
+    def _register_raw_input(self, flags: int, hwnd) -> bool:
+        """Register (or remove) raw input for keyboards and mice"""
+        # RIDEV_INPUTSINK is deliberately not used: it would deliver WM_INPUT
+        # for every keystroke and mouse move, and only device changes matter
+        devices = (RAWINPUTDEVICE * 2)(
+            RAWINPUTDEVICE(HID_USAGE_PAGE_GENERIC, HID_USAGE_GENERIC_KEYBOARD, flags, hwnd),
+            RAWINPUTDEVICE(HID_USAGE_PAGE_GENERIC, HID_USAGE_GENERIC_MOUSE, flags, hwnd),
+        )
+        if not user32.RegisterRawInputDevices(
+            devices, len(devices), ctypes.sizeof(RAWINPUTDEVICE)
+        ):
+            logger.error(f"Error registering raw input: {ctypes.WinError(ctypes.get_last_error())}")
+            return False
+        return True
+
+    def _on_device_change(self, hwnd, msg, wparam, lparam):
+        """Handle WM_DEVICECHANGE for HID interface arrival/removal"""
+        if wparam in (DBT_DEVICEARRIVAL, DBT_DEVICEREMOVECOMPLETE):
+            # Don't enumerate per event; the count is checked once the burst settles
+            self._set_state(self._RECOUNT)
+        return True
+
+    def _on_input_device_change(self, hwnd, msg, wparam, lparam):
+        """Handle WM_INPUT_DEVICE_CHANGE for keyboard/mouse arrival/removal"""
+        if wparam == GIDC_ARRIVAL:
+            self._set_state("home")
+        elif wparam == GIDC_REMOVAL:
+            self._set_state("work")
+        return 0
+
+    def _set_state(self, new_state: str):
+        """Record a detected state and (re)start the debounce timer"""
+        with self._state_lock:
+            self._pending_state = new_state
+
+            # Every event pushes the deadline out, so only the state left
+            # standing once the burst is over gets acted on
+            if self._timer:
+                self._timer.cancel()
+            timer = threading.Timer(self.DEBOUNCE_SECONDS, lambda: self._settle(timer))
+            timer.daemon = True
+            self._timer = timer
+            timer.start()
+
+    def _settle(self, timer: threading.Timer):
+        """Invoke the callback if the debounced state differs from the last one"""
+        with self._state_lock:
+            # A timer cancelled too late may still fire; only the most
+            # recently scheduled one may act
+            if self._stop_event.is_set() or timer is not self._timer:
+                return
+            new_state = self._pending_state
+            if new_state is None:
+                return
+            self._pending_state = None
+            self._timer = None
+
+            # One enumeration per burst, however many events it contained.
+            # Comparing against the last count rather than trusting each event
+            # resolves the burst to its net change.
+            current_count = self._count_input_devices()
+            if new_state == self._RECOUNT:
+                if current_count > self.last_device_count:
+                    # Devices appeared = switched to this machine
+                    new_state = "home"
+                elif current_count < self.last_device_count:
+                    # Devices disappeared = switched away from this machine
+                    new_state = "work"
+                else:
+                    new_state = None
+            self.last_device_count = current_count
+
+            if new_state is None or new_state == self.last_state:
+                return
+            old_state = self.last_state
+            self.last_state = new_state
+
+        logger.info(f"KM switch detected: {old_state} -> {new_state}")
+        self._settled.put(new_state)
 
     def _count_input_devices(self) -> int:
-        """Count active input devices (keyboards and mice)"""
+        """Count present HID device interfaces (keyboards and mice)"""
         try:
-            # Use Windows API to enumerate HID devices
-            import win32api
-            device_count = 0
-
-            # Count keyboards
-            device_count += win32api.GetSystemMetrics(win32con.SM_CMOUSEBUTTONS)
+            hdev = _SetupDiGetClassDevs(
+                _HID_INTERFACE_GUID_REF, None, None, _HID_PRESENT_FLAGS
+            )
+            if hdev in (None, INVALID_HANDLE_VALUE):
+                raise ctypes.WinError(ctypes.get_last_error())
 
-            # Simple approach: check if we can get keyboard state
-            # If keyboard is available, GetKeyState won't fail
             try:
-                for vk in [win32con.VK_SHIFT, win32con.VK_CONTROL, win32con.VK_MENU]:
-                    win32api.GetKeyState(vk)
-                device_count += 2  # Keyboard is present
-            except:
-                pass
-
-            return device_count
+                data = SP_DEVICE_INTERFACE_DATA()
+                data.cbSize = _SP_DEVICE_INTERFACE_DATA_SIZE
+                data_ref = ctypes.byref(data)
+                device_count = 0
+                while _SetupDiEnumDeviceInterfaces(
+                    hdev, None, _HID_INTERFACE_GUID_REF, device_count, data_ref
+                ):
+                    device_count += 1
+                return device_count
+            finally:
+                _SetupDiDestroyDeviceInfoList(hdev)
         except Exception as e:
             logger.error(f"Error counting devices: {e}")
             return 0
@@ -249,7 +561,7 @@ class ConfigWindow:
         self.root.after_idle(self.root.attributes, '-topmost', False)
 
         # Create UI
-        self._create_widgets()
+        self._create_widgets(tk, ttk)
 
         # Center window
         self.root.update_idletasks()
@@ -257,11 +569,8 @@ class ConfigWindow:
         y = (self.root.winfo_screenheight() // 2) - (self.root.winfo_height() // 2)
         self.root.geometry(f"+{x}+{y}")
 
-    def _create_widgets(self):
+    def _create_widgets(self, tk, ttk):
         """Create configuration UI widgets"""
-        import tkinter as tk
-        from tkinter import ttk
-
         # Main frame with padding
         main_frame = ttk.Frame(self.root, padding="20")
         main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -309,9 +618,11 @@ class ConfigWindow:
 
     def _save(self):
         """Save configuration"""
-        self.config.set('home_machine_input', self.home_input.get())
-        self.config.set('work_laptop_input', self.work_input.get())
-        self.config.set('monitor_index', int(self.monitor_index.get()))
+        self.config.update({
+            'home_machine_input': self.home_input.get(),
+            'work_laptop_input': self.work_input.get(),
+            'monitor_index': int(self.monitor_index.get()),
+        })
 
         self.status_label.config(text="Configuration saved!")
 
@@ -333,6 +644,9 @@ class ConfigWindow:
 class MonitorSwitcherApp:
     """Main application class"""
 
+    # Notifications within this window collapse into one showing the latest
+    NOTIFY_COALESCE_SECONDS = 0.5
+
     def __init__(self):
         self.config = Config()
         self.monitor_controller = MonitorController(
@@ -340,6 +654,33 @@ class MonitorSwitcherApp:
         )
         self.km_detector = KMSwitchDetector(callback=self._on_km_switch)
         self.icon = None
+        self._pending_notify = None
+        self._notify_timer = None
+        self._notify_lock = threading.Lock()
+
+    def _notify(self, text: str, title: str):
+        """Queue a tray notification; a burst is posted once, with its last message"""
+        if not self.icon:
+            return
+
+        with self._notify_lock:
+            self._pending_notify = (text, title)
+            if self._notify_timer is None:
+                self._notify_timer = threading.Timer(
+                    self.NOTIFY_COALESCE_SECONDS, self._flush_notify
+                )
+                self._notify_timer.daemon = True
+                self._notify_timer.start()
+
+    def _flush_notify(self):
+        """Post the latest pending notification"""
+        with self._notify_lock:
+            pending = self._pending_notify
+            self._pending_notify = None
+            self._notify_timer = None
+
+        if pending and self.icon:
+            self.icon.notify(*pending)
 
     def _on_km_switch(self, machine: str):
         """Callback when KM switch is detected"""
@@ -356,41 +697,34 @@ class MonitorSwitcherApp:
 
         if success:
             self.config.set('last_active_machine', machine)
-            if self.icon:
-                self.icon.notify(
-                    f"Switched to {machine} machine ({input_name})",
-                    "Monitor Switcher"
-                )
+            self._notify(
+                f"Switched to {machine} machine ({input_name})",
+                "Monitor Switcher"
+            )
         else:
-            if self.icon:
-                self.icon.notify(
-                    f"Failed to switch to {input_name}",
-                    "Monitor Switcher - Error"
-                )
+            self._notify(
+                f"Failed to switch to {input_name}",
+                "Monitor Switcher - Error"
+            )
 
     def _create_image(self):
-        """Create system tray icon"""
-        # Create a simple icon with "M" letter
-        width = 64
-        height = 64
-        image = Image.new('RGB', (width, height), color='#2E86AB')
-        dc = ImageDraw.Draw(image)
-
-        # Draw "M" for Monitor
-        dc.text((width//2, height//2), "M", fill='white', anchor='mm',
-                font_size=32 if hasattr(dc, 'font_size') else None)
+        """Load the system tray icon"""
+        from PIL import Image
 
-        return image
+        return Image.open(RESOURCE_DIR / 'icon.ico')
 
     def _show_config(self, icon, item):
         """Show configuration window"""
         logger.info("Opening configuration window")
 
         def on_save():
-            # Reinitialize monitor controller with new settings
+            # Reinitialize monitor controller with new settings; swap it in
+            # before closing the old one so new switches use the new one
+            old_controller = self.monitor_controller
             self.monitor_controller = MonitorController(
                 monitor_index=self.config.get('monitor_index', 0)
             )
+            old_controller.close()
             logger.info("Configuration updated")
 
         config_window = ConfigWindow(self.config, on_save_callback=on_save)
@@ -408,10 +742,18 @@ class MonitorSwitcherApp:
         """Quit the application"""
         logger.info("Shutting down...")
         self.km_detector.stop()
+        self.monitor_controller.close()
+        with self._notify_lock:
+            if self._notify_timer:
+                self._notify_timer.cancel()
+                self._notify_timer = None
+            self._pending_notify = None
         icon.stop()
 
     def run(self):
         """Run the application"""
+        import pystray
+
         logger.info("Starting Monitor Switcher...")
 
         # Start KM switch detector
@@ -434,12 +776,19 @@ class MonitorSwitcherApp:
             menu
         )
 
+        # Warm up tkinter while the tray sits idle so the first
+        # "Configure" click doesn't pay for the import
+        threading.Thread(
+            target=importlib.import_module, args=('tkinter.ttk',), daemon=True
+        ).start()
+
         logger.info("Monitor Switcher running in system tray")
         self.icon.run()
 
 
 def main():
     """Main entry point"""
+    log_listener.start()
     try:
         app = MonitorSwitcherApp()
         app.run()
@@ -449,6 +798,9 @@ def main():
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        # Flush any queued records before exiting
+        log_listener.stop()
 
 
 if __name__ == "__main__":